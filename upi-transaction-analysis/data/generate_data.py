@@ -7,7 +7,7 @@ import pandas as pd
 import numpy as np
 import os
 
-np.random.seed(42)
+rng = np.random.default_rng(42)
 
 CATEGORIES = [
     "Food & Dining", "Shopping", "Transport", "Utilities",
@@ -34,12 +34,22 @@ PAYMENT_MODES = ["UPI ID", "QR Code", "Phone Number"]
 BANKS = ["SBI", "HDFC", "ICICI", "Axis", "Kotak", "PNB", "Canara", "BOB"]
 
 def generate_dataset(n=1000):
-    dates = pd.date_range("2024-01-01", "2024-12-31", periods=n)
-    dates = dates + pd.to_timedelta(np.random.randint(0, 86400, n), unit='s')
-    dates = dates.sort_values()
-
-    categories = np.random.choice(CATEGORIES, n, p=[0.22, 0.20, 0.15, 0.12, 0.10, 0.08, 0.07, 0.06])
-    merchants  = [np.random.choice(MERCHANTS[c]) for c in categories]
+    # Cumulative exponential inter-arrival gaps are sorted by construction,
+    # so no O(n log n) re-sort is needed; rescale so they span the full year
+    start = pd.Timestamp("2024-01-01")
+    total_seconds = (pd.Timestamp("2025-01-01") - start).total_seconds()
+    seconds = np.cumsum(rng.exponential(scale=total_seconds / n, size=n))
+    seconds *= (total_seconds - 1) / seconds[-1]   # keep the last txn inside 2024
+    dates = pd.DatetimeIndex(start + pd.to_timedelta(seconds, unit="s"))
+
+    categories = rng.choice(CATEGORIES, n, p=[0.22, 0.20, 0.15, 0.12, 0.10, 0.08, 0.07, 0.06])
+    codes = pd.Categorical(categories, categories=CATEGORIES).codes
+
+    # One merchant draw per category instead of one per row
+    merchants = np.empty(n, dtype=object)
+    for k, cat in enumerate(CATEGORIES):
+        mask = codes == k
+        merchants[mask] = rng.choice(MERCHANTS[cat], size=mask.sum())
 
     # Amount distribution per category
     amount_params = {
@@ -52,42 +62,36 @@ def generate_dataset(n=1000):
         "Education":       (2000, 1500),
         "Travel":          (3500, 2500),
     }
-    amounts = []
-    for c in categories:
-        mu, sigma = amount_params[c]
-        val = int(max(50, np.random.normal(mu, sigma)))
-        amounts.append(val)
+    mu_arr    = np.array([amount_params[c][0] for c in CATEGORIES])[codes]
+    sigma_arr = np.array([amount_params[c][1] for c in CATEGORIES])[codes]
+    amounts   = np.maximum(50, rng.normal(mu_arr, sigma_arr, n)).astype(np.int32)
 
-    hours = dates.hour
+    hours = np.asarray(dates.hour)
 
     # Fraud detection: anomalous = very high amount + odd hours (1–5 AM)
-    is_fraud = np.array([
-        (amt > 5000 and hr in range(1, 5)) or
-        (amt > 7000 and np.random.rand() < 0.4) or
-        (amt > 4000 and hr in range(2, 4) and np.random.rand() < 0.3)
-        for amt, hr in zip(amounts, hours)
-    ])
+    rand = rng.random(n)
+    is_fraud = (
+        ((amounts > 5000) & (hours >= 1) & (hours < 5))
+        | ((amounts > 7000) & (rand < 0.4))
+        | ((amounts > 4000) & (hours >= 2) & (hours < 4) & (rand < 0.3))
+    )
 
     statuses = np.where(is_fraud, "Flagged", "Success")
 
+    # date/time/month/day/hour are all derivable from datetime — load_data
+    # reconstructs them, so only datetime is persisted
     df = pd.DataFrame({
-        "transaction_id":   [f"TXN{str(i+1).zfill(5)}" for i in range(n)],
-        "date":             dates.date,
-        "time":             dates.time,
+        "transaction_id":   np.char.add("TXN", np.char.zfill(np.arange(1, n + 1).astype(str), 5)),
         "datetime":         dates,
-        "month":            dates.month,
-        "month_name":       dates.strftime("%B"),
-        "day_of_week":      dates.day_name(),
-        "hour":             hours,
         "category":         categories,
         "merchant":         merchants,
         "amount":           amounts,
-        "payment_mode":     np.random.choice(PAYMENT_MODES, n, p=[0.50, 0.30, 0.20]),
-        "sender_bank":      np.random.choice(BANKS, n),
-        "receiver_bank":    np.random.choice(BANKS, n),
-        "state":            np.random.choice(STATES, n),
+        "payment_mode":     rng.choice(PAYMENT_MODES, n, p=[0.50, 0.30, 0.20]),
+        "sender_bank":      rng.choice(BANKS, n),
+        "receiver_bank":    rng.choice(BANKS, n),
+        "state":            rng.choice(STATES, n),
         "status":           statuses,
-        "is_fraud":         is_fraud.astype(int),
+        "is_fraud":         is_fraud.astype(np.int8),
     })
 
     return df
@@ -97,5 +101,13 @@ if __name__ == "__main__":
     df = generate_dataset(1000)
     os.makedirs("data", exist_ok=True)
     df.to_csv("data/upi_transactions.csv", index=False)
+
+    # Parquet cache keeps dtypes (categoricals, datetime64), so load_data
+    # can skip re-parsing and re-casting on every run
+    for col in ["category", "merchant", "payment_mode", "sender_bank",
+                "receiver_bank", "state", "status"]:
+        df[col] = df[col].astype("category")
+    df.to_parquet("data/upi_transactions.parquet", index=False)
+
     print(f"✅ Dataset generated: {len(df)} transactions")
     print(df.head())
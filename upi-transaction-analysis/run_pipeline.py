@@ -0,0 +1,53 @@
+"""
+run_pipeline.py
+End-to-end pipeline: load the dataset, compute every summary once,
+and render all charts to the outputs directory.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
+
+from analysis import Summaries, basic_info, compute_anomaly_score, load_data
+import visualizations as viz
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "data", "upi_transactions.csv")
+
+
+def main(data_path: str = DATA_PATH, output_dir: str = "outputs"):
+    df = load_data(data_path)
+    df["anomaly_score"] = compute_anomaly_score(df)
+    summaries = Summaries(df)
+
+    # Shared precomputed inputs — split fraud/normal once, each plot gets
+    # aggregates or arrays rather than the raw frame
+    is_fraud = df["is_fraud"].to_numpy().astype(bool)
+    amt = df["amount"].to_numpy()
+    scores = df["anomaly_score"].to_numpy()
+    top_risky = df.nlargest(20, "anomaly_score")[
+        ["transaction_id", "merchant", "amount", "anomaly_score", "is_fraud"]
+    ]
+
+    viz.plot_kpi_banner(basic_info(df), output_dir)
+    viz.plot_monthly_trend(summaries.monthly_summary(), output_dir)
+    viz.plot_category_breakdown(summaries.category_summary(), output_dir)
+    viz.plot_top_merchants(summaries.top_merchants(), output_dir)
+    viz.plot_dayofweek(summaries.dayofweek_summary(), output_dir)
+    viz.plot_hourly_heatmap(df, output_dir)
+    viz.plot_fraud_dashboard(
+        df["status"].value_counts(),
+        summaries.hourly_summary(),
+        summaries.monthly_summary(),
+        amt[~is_fraud],
+        amt[is_fraud],
+        output_dir,
+    )
+    viz.plot_payment_mode(summaries.payment_mode_summary(), summaries.sender_bank_summary(), output_dir)
+    viz.plot_anomaly_scores(scores[~is_fraud], scores[is_fraud], top_risky, output_dir)
+    viz.plot_state_spend(summaries.state_summary(), output_dir)
+    viz.flush_saves()
+
+
+if __name__ == "__main__":
+    main()
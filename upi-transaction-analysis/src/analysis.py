@@ -3,6 +3,8 @@ src/analysis.py
 Core analysis functions for UPI Transaction Analysis project.
 """
 
+import os
+
 import pandas as pd
 import numpy as np
 
@@ -11,16 +13,36 @@ import numpy as np
 # 1. DATA LOADING & VALIDATION
 # ─────────────────────────────────────────────
 
+CATEGORICAL_COLS = [
+    "category", "merchant", "payment_mode", "sender_bank",
+    "receiver_bank", "state", "status",
+]
+
+MONTH_ORDER = ["January","February","March","April","May","June",
+               "July","August","September","October","November","December"]
+
+DAY_ORDER = ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
+
+
 def load_data(filepath: str) -> pd.DataFrame:
-    """Load and parse UPI transaction CSV."""
-    df = pd.read_csv(filepath, parse_dates=["datetime"])
-    df["date"] = pd.to_datetime(df["date"])
-    df["month_name"] = pd.Categorical(
-        df["month_name"],
-        categories=["January","February","March","April","May","June",
-                    "July","August","September","October","November","December"],
-        ordered=True
-    )
+    """Load UPI transactions, preferring the Parquet cache over the CSV."""
+    parquet_path = os.path.splitext(filepath)[0] + ".parquet"
+    if os.path.exists(parquet_path):
+        # dtypes (categoricals, datetime64) round-trip through parquet,
+        # so no re-parsing or re-casting is needed
+        df = pd.read_parquet(parquet_path)
+    else:
+        dtypes = {col: "category" for col in CATEGORICAL_COLS}
+        dtypes.update({"amount": "int32", "is_fraud": "int8"})
+        df = pd.read_csv(filepath, parse_dates=["datetime"], dtype=dtypes)
+    # Only datetime is persisted — derive the calendar columns here
+    dt = df["datetime"].dt
+    df["date"] = dt.normalize()
+    df["hour"] = dt.hour.astype("int8")
+    df["month"] = dt.month.astype("int8")
+    df["day_of_week"] = dt.day_name().astype("category")
+    df["dow_code"] = dt.dayofweek.astype("int8")   # Monday=0 … Sunday=6
+    df["month_name"] = dt.month_name().astype(pd.CategoricalDtype(MONTH_ORDER, ordered=True))
     return df
 
 
@@ -40,131 +62,188 @@ def basic_info(df: pd.DataFrame) -> dict:
 
 
 # ─────────────────────────────────────────────
-# 2. SPENDING PATTERN ANALYSIS
+# 2. SUMMARY AGGREGATIONS (cached groupers)
 # ─────────────────────────────────────────────
 
-def monthly_summary(df: pd.DataFrame) -> pd.DataFrame:
-    """Aggregate spend, count, and fraud by month."""
-    return (
-        df.groupby("month_name", observed=True)
-          .agg(
-              total_spend=("amount", "sum"),
-              transaction_count=("amount", "count"),
-              avg_spend=("amount", "mean"),
-              flagged=("is_fraud", "sum"),
-          )
-          .reset_index()
-    )
-
-
-def category_summary(df: pd.DataFrame) -> pd.DataFrame:
-    """Aggregate spend and count by category."""
-    return (
-        df.groupby("category")
-          .agg(
-              total_spend=("amount", "sum"),
-              transaction_count=("amount", "count"),
-              avg_spend=("amount", "mean"),
-              flagged=("is_fraud", "sum"),
-          )
-          .sort_values("total_spend", ascending=False)
-          .reset_index()
-    )
-
-
-def top_merchants(df: pd.DataFrame, n: int = 10) -> pd.DataFrame:
-    """Top N merchants by total spend."""
-    return (
-        df.groupby("merchant")
-          .agg(total_spend=("amount", "sum"), count=("amount", "count"))
-          .sort_values("total_spend", ascending=False)
-          .head(n)
-          .reset_index()
-    )
-
-
-def dayofweek_summary(df: pd.DataFrame) -> pd.DataFrame:
-    """Average and total spend by day of week."""
-    order = ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
-    summary = (
-        df.groupby("day_of_week")
-          .agg(total_spend=("amount","sum"), count=("amount","count"), avg_spend=("amount","mean"))
-          .reindex(order)
-          .reset_index()
-    )
-    return summary
-
-
-def hourly_summary(df: pd.DataFrame) -> pd.DataFrame:
-    """Transaction count and fraud count by hour."""
-    return (
-        df.groupby("hour")
-          .agg(count=("amount","count"), flagged=("is_fraud","sum"), total_spend=("amount","sum"))
-          .reset_index()
-    )
-
-
-def payment_mode_summary(df: pd.DataFrame) -> pd.DataFrame:
-    """Breakdown by payment mode."""
-    return (
-        df.groupby("payment_mode")
-          .agg(count=("amount","count"), total_spend=("amount","sum"), avg_spend=("amount","mean"))
-          .reset_index()
-    )
-
-
-def state_summary(df: pd.DataFrame) -> pd.DataFrame:
-    """Spending by state."""
-    return (
-        df.groupby("state")
-          .agg(total_spend=("amount","sum"), count=("amount","count"))
-          .sort_values("total_spend", ascending=False)
-          .reset_index()
-    )
-
-
-# ─────────────────────────────────────────────
-# 3. FRAUD ANALYSIS
-# ─────────────────────────────────────────────
-
-def fraud_summary(df: pd.DataFrame) -> pd.DataFrame:
-    """All flagged transactions."""
-    return df[df["is_fraud"] == 1].sort_values("amount", ascending=False).reset_index(drop=True)
-
-
-def fraud_by_hour(df: pd.DataFrame) -> pd.DataFrame:
-    return df.groupby("hour")["is_fraud"].agg(["sum","count"]).rename(columns={"sum":"fraud","count":"total"}).reset_index()
-
-
-def fraud_by_category(df: pd.DataFrame) -> pd.DataFrame:
-    return (
-        df.groupby("category")
-          .agg(fraud_count=("is_fraud","sum"), total=("amount","count"), fraud_amount=("amount", lambda x: x[df.loc[x.index,"is_fraud"]==1].sum()))
-          .reset_index()
-          .sort_values("fraud_count", ascending=False)
-    )
+class Summaries:
+    """
+    Summary aggregations over one transaction DataFrame.
 
+    Each groupby key is factorized once and the resulting GroupBy object
+    is reused across methods, instead of rebuilding it per summary.
+    """
 
-def fraud_by_month(df: pd.DataFrame) -> pd.DataFrame:
-    return (
-        df.groupby("month_name", observed=True)
-          .agg(fraud=("is_fraud","sum"), total=("amount","count"))
-          .reset_index()
-    )
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._g_month    = df.groupby("month_name", observed=True)
+        self._g_category = df.groupby("category", observed=True)
+        self._g_merchant = df.groupby("merchant", observed=True)
+        self._g_dow      = df.groupby("dow_code")
+        self._g_hour     = df.groupby("hour")
+        self._g_mode     = df.groupby("payment_mode", observed=True)
+        self._g_sender   = df.groupby("sender_bank", observed=True)
+        self._g_state    = df.groupby("state", observed=True)
+        self._hourly     = None
+
+    def monthly_summary(self) -> pd.DataFrame:
+        """Aggregate spend, count, and fraud by month."""
+        return (
+            self._g_month
+                .agg(
+                    total_spend=("amount", "sum"),
+                    transaction_count=("amount", "count"),
+                    avg_spend=("amount", "mean"),
+                    flagged=("is_fraud", "sum"),
+                )
+                .reset_index()
+        )
+
+    def category_summary(self) -> pd.DataFrame:
+        """Aggregate spend and count by category."""
+        return (
+            self._g_category
+                .agg(
+                    total_spend=("amount", "sum"),
+                    transaction_count=("amount", "count"),
+                    avg_spend=("amount", "mean"),
+                    flagged=("is_fraud", "sum"),
+                )
+                .sort_values("total_spend", ascending=False)
+                .reset_index()
+        )
+
+    def top_merchants(self, n: int = 10) -> pd.DataFrame:
+        """Top N merchants by total spend."""
+        return (
+            self._g_merchant
+                .agg(total_spend=("amount", "sum"), count=("amount", "count"))
+                .sort_values("total_spend", ascending=False)
+                .head(n)
+                .reset_index()
+        )
+
+    def dayofweek_summary(self) -> pd.DataFrame:
+        """Average and total spend by day of week, grouped on int day codes."""
+        summary = (
+            self._g_dow
+                .agg(total_spend=("amount","sum"), count=("amount","count"), avg_spend=("amount","mean"))
+                .reindex(range(7))
+                .reset_index(drop=True)
+        )
+        summary.insert(0, "day_of_week", DAY_ORDER)
+        return summary
+
+    def hourly_summary(self) -> pd.DataFrame:
+        """Transaction count, fraud count, and spend by hour."""
+        if self._hourly is None:
+            self._hourly = (
+                self._g_hour
+                    .agg(count=("amount","count"), flagged=("is_fraud","sum"), total_spend=("amount","sum"))
+                    .reset_index()
+            )
+        return self._hourly
+
+    def payment_mode_summary(self) -> pd.DataFrame:
+        """Breakdown by payment mode."""
+        return (
+            self._g_mode
+                .agg(count=("amount","count"), total_spend=("amount","sum"), avg_spend=("amount","mean"))
+                .reset_index()
+        )
+
+    def sender_bank_summary(self) -> pd.DataFrame:
+        """Total spend by sender bank."""
+        return (
+            self._g_sender
+                .agg(total_spend=("amount","sum"))
+                .sort_values("total_spend", ascending=False)
+                .reset_index()
+        )
+
+    def state_summary(self) -> pd.DataFrame:
+        """Spending by state."""
+        return (
+            self._g_state
+                .agg(total_spend=("amount","sum"), count=("amount","count"))
+                .sort_values("total_spend", ascending=False)
+                .reset_index()
+        )
+
+    # ── Fraud aggregations ──
+
+    def fraud_summary(self) -> pd.DataFrame:
+        """All flagged transactions."""
+        df = self.df
+        return df[df["is_fraud"] == 1].sort_values("amount", ascending=False).reset_index(drop=True)
+
+    def fraud_by_hour(self) -> pd.DataFrame:
+        """Fraud vs total count by hour, projected from the hourly summary."""
+        hourly = self.hourly_summary()
+        return hourly[["hour", "flagged", "count"]].rename(columns={"flagged": "fraud", "count": "total"})
+
+    def fraud_by_category(self) -> pd.DataFrame:
+        # fraud_amount lives in a local frame so the helper column never
+        # leaks into self.df (and e.g. fraud_summary's output)
+        tmp = self.df.assign(fraud_amount=self.df["amount"] * self.df["is_fraud"])
+        return (
+            tmp.groupby("category", observed=True)
+               .agg(fraud_count=("is_fraud","sum"), total=("amount","count"), fraud_amount=("fraud_amount","sum"))
+               .reset_index()
+               .sort_values("fraud_count", ascending=False)
+        )
+
+    def fraud_by_month(self) -> pd.DataFrame:
+        return (
+            self._g_month
+                .agg(fraud=("is_fraud","sum"), total=("amount","count"))
+                .reset_index()
+        )
 
 
 # ─────────────────────────────────────────────
 # 4. ANOMALY SCORING (Rule-based)
 # ─────────────────────────────────────────────
 
-def compute_anomaly_score(df: pd.DataFrame) -> pd.DataFrame:
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; the NumPy kernel below is used instead
+    njit = None
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True, fastmath=True)
+    def _score_kernel(amount, hour, q95):
+        n = amount.size
+        order = np.argsort(amount, kind="mergesort")
+        rank = np.empty(n, np.float32)
+        for i in prange(n):
+            rank[order[i]] = (i + 1) / n
+        out = np.empty(n, np.float32)
+        for i in prange(n):
+            s = rank[i] * 40.0                 # 0–40 pts
+            if 1 <= hour[i] < 5:
+                s += 30.0                      # odd hour: +30 pts
+            if amount[i] > q95:
+                s += 20.0                      # above 95th percentile: +20 pts
+            out[i] = min(100.0, s)
+        return out
+else:
+    def _score_kernel(amount, hour, q95):
+        n = amount.size
+        rank = np.empty(n, np.float32)
+        rank[np.argsort(amount, kind="stable")] = np.arange(1, n + 1, dtype=np.float32) / n
+        score = rank * 40.0 + np.where((hour >= 1) & (hour < 5), 30.0, 0.0) + (amount > q95) * 20.0
+        return np.minimum(np.float32(100.0), score.astype(np.float32))
+
+
+def compute_anomaly_score(df: pd.DataFrame) -> pd.Series:
     """
-    Assign a simple rule-based anomaly score (0–100) to each transaction.
+    Compute a simple rule-based anomaly score (0–100) per transaction.
     Factors: amount percentile, odd hour, repeat merchant in short window.
+    Returns a Series for the caller to assign — no copy of the frame.
     """
-    df = df.copy()
-    amount_pct = df["amount"].rank(pct=True) * 40          # 0–40 pts
-    odd_hour    = df["hour"].apply(lambda h: 30 if h in range(1, 5) else 0)  # 0 or 30 pts
-    high_val    = (df["amount"] > df["amount"].quantile(0.95)).astype(int) * 20  # 0 or 20 pts
-    df["anomaly_score"] = (amount_pct + odd_hour + high_val).clip(0, 100).round(1)
-    return df
+    a = df["amount"].to_numpy()
+    h = df["hour"].to_numpy()
+    k = int(0.95 * a.size)
+    q95 = np.partition(a, k)[k]    # O(n) selection instead of a full sort
+    return pd.Series(np.round(_score_kernel(a, h, q95), 1), index=df.index, name="anomaly_score")
@@ -4,6 +4,12 @@ All plotting functions for UPI Transaction Analysis.
 Uses matplotlib + seaborn with a consistent dark theme.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mticker
 import seaborn as sns
@@ -46,25 +52,66 @@ def set_style():
         "legend.fontsize":   9,
         "text.color":        TEXT_CLR,
         "font.family":       "monospace",
+        "figure.constrained_layout.use": True,
     })
 
 set_style()
 
+@lru_cache(maxsize=None)
+def _fig_cache(size):
+    return plt.figure(figsize=size)
+
+
+def _get_fig(width, height):
+    """Reuse one Figure per canvas size — clearing it is far cheaper than
+    rebuilding axes, spines, and ticks from scratch on every call."""
+    fig = _fig_cache((width, height))
+    fig.clear()
+    return fig
+
+
+# PNG disk writes release the GIL, so they overlap with rendering the next figure
+_png_writer = ThreadPoolExecutor(max_workers=4)
+_pending_saves = []
+
+
+def _write_bytes(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def flush_saves():
+    """Wait for all queued PNG writes, re-raising any write error."""
+    for future in _pending_saves:
+        future.result()
+    _pending_saves.clear()
+
+
 def savefig(fig, name: str, output_dir: str = "outputs"):
     os.makedirs(output_dir, exist_ok=True)
     path = os.path.join(output_dir, name)
-    fig.savefig(path, dpi=150, bbox_inches="tight", facecolor=DARK_BG)
+    buf = BytesIO()
+    fig.savefig(buf, format="png", dpi=150, facecolor=DARK_BG)
+    _pending_saves.append(_png_writer.submit(_write_bytes, path, buf.getvalue()))
     print(f"  ✅ Saved → {path}")
     return path
 
 
+def _hist_density(values, edges):
+    """np.histogram density that returns zeros for an empty array."""
+    if values.size == 0:
+        return np.zeros(len(edges) - 1)
+    return np.histogram(values, bins=edges, density=True)[0]
+
+
 # ─────────────────────────────────────────────
 # PLOT 1 – Overview KPI Banner
 # ─────────────────────────────────────────────
 def plot_kpi_banner(info: dict, output_dir="outputs"):
-    fig, axes = plt.subplots(1, 5, figsize=(18, 3))
+    fig = _get_fig(18, 3)
+    axes = fig.subplots(1, 5)
     fig.suptitle("UPI TRANSACTION ANALYSIS  ·  2024", fontsize=15, fontweight="bold",
-                 color=TEXT_CLR, y=1.02, x=0.5, ha="center")
+                 color=TEXT_CLR)
 
     kpis = [
         ("Total Transactions", f"{info['total_transactions']:,}",         ACCENT),
@@ -83,7 +130,6 @@ def plot_kpi_banner(info: dict, output_dir="outputs"):
                 fontsize=9, color=MUTED_CLR, fontweight="normal")
         ax.set_xticks([]); ax.set_yticks([])
 
-    plt.tight_layout()
     return savefig(fig, "01_kpi_banner.png", output_dir)
 
 
@@ -91,7 +137,8 @@ def plot_kpi_banner(info: dict, output_dir="outputs"):
 # PLOT 2 – Monthly Spend Trend
 # ─────────────────────────────────────────────
 def plot_monthly_trend(monthly_df: pd.DataFrame, output_dir="outputs"):
-    fig, ax = plt.subplots(figsize=(14, 5))
+    fig = _get_fig(14, 5)
+    ax = fig.subplots()
     x  = range(len(monthly_df))
     y  = monthly_df["total_spend"] / 1000
     ax.fill_between(x, y, alpha=0.15, color=ACCENT)
@@ -107,7 +154,6 @@ def plot_monthly_trend(monthly_df: pd.DataFrame, output_dir="outputs"):
     ax.yaxis.set_major_formatter(mticker.FuncFormatter(lambda v, _: f"₹{v:.0f}k"))
     ax.set_title("Monthly Spending Trend (Jan–Dec 2024)")
     ax.set_xlabel("Month"); ax.set_ylabel("Total Spend (₹ thousands)")
-    plt.tight_layout()
     return savefig(fig, "02_monthly_trend.png", output_dir)
 
 
@@ -115,7 +161,8 @@ def plot_monthly_trend(monthly_df: pd.DataFrame, output_dir="outputs"):
 # PLOT 3 – Category Breakdown (Donut + Bar)
 # ─────────────────────────────────────────────
 def plot_category_breakdown(cat_df: pd.DataFrame, output_dir="outputs"):
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+    fig = _get_fig(16, 6)
+    ax1, ax2 = fig.subplots(1, 2)
 
     # Donut
     wedges, texts, autotexts = ax1.pie(
@@ -139,7 +186,6 @@ def plot_category_breakdown(cat_df: pd.DataFrame, output_dir="outputs"):
     ax2.set_title("Total Spend per Category (₹ thousands)")
     ax2.set_xlabel("Total Spend (₹k)")
     ax2.invert_yaxis()
-    plt.tight_layout()
     return savefig(fig, "03_category_breakdown.png", output_dir)
 
 
@@ -147,7 +193,8 @@ def plot_category_breakdown(cat_df: pd.DataFrame, output_dir="outputs"):
 # PLOT 4 – Top Merchants
 # ─────────────────────────────────────────────
 def plot_top_merchants(merchant_df: pd.DataFrame, output_dir="outputs"):
-    fig, ax = plt.subplots(figsize=(12, 6))
+    fig = _get_fig(12, 6)
+    ax = fig.subplots()
     colors = [PALETTE[i % len(PALETTE)] for i in range(len(merchant_df))]
     bars = ax.barh(merchant_df["merchant"], merchant_df["total_spend"]/1000,
                    color=colors, edgecolor=DARK_BG, height=0.6)
@@ -157,7 +204,6 @@ def plot_top_merchants(merchant_df: pd.DataFrame, output_dir="outputs"):
     ax.set_title("Top 10 Merchants by Total Spend")
     ax.set_xlabel("Total Spend (₹ thousands)")
     ax.invert_yaxis()
-    plt.tight_layout()
     return savefig(fig, "04_top_merchants.png", output_dir)
 
 
@@ -165,7 +211,8 @@ def plot_top_merchants(merchant_df: pd.DataFrame, output_dir="outputs"):
 # PLOT 5 – Day of Week Pattern
 # ─────────────────────────────────────────────
 def plot_dayofweek(dow_df: pd.DataFrame, output_dir="outputs"):
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+    fig = _get_fig(14, 5)
+    ax1, ax2 = fig.subplots(1, 2)
 
     colors = [ACCENT2 if d in ["Saturday","Sunday"] else ACCENT for d in dow_df["day_of_week"]]
     ax1.bar(dow_df["day_of_week"].str[:3], dow_df["total_spend"]/1000, color=colors, edgecolor=DARK_BG, width=0.6)
@@ -177,7 +224,6 @@ def plot_dayofweek(dow_df: pd.DataFrame, output_dir="outputs"):
     ax2.set_title("Transaction Count by Day of Week")
     ax2.set_ylabel("Number of Transactions")
 
-    plt.tight_layout()
     return savefig(fig, "05_dayofweek_pattern.png", output_dir)
 
 
@@ -185,36 +231,37 @@ def plot_dayofweek(dow_df: pd.DataFrame, output_dir="outputs"):
 # PLOT 6 – Hourly Activity Heatmap
 # ─────────────────────────────────────────────
 def plot_hourly_heatmap(df: pd.DataFrame, output_dir="outputs"):
-    pivot = df.groupby(["day_of_week","hour"])["amount"].count().unstack(fill_value=0)
     order = ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
-    pivot = pivot.reindex([d for d in order if d in pivot.index])
+    counts = np.zeros((7, 24), dtype=np.int32)
+    np.add.at(counts, (df["dow_code"].to_numpy(), df["hour"].to_numpy()), 1)
+    pivot = pd.DataFrame(counts, index=order, columns=range(24))
 
-    fig, ax = plt.subplots(figsize=(18, 5))
+    fig = _get_fig(18, 5)
+    ax = fig.subplots()
     sns.heatmap(pivot, ax=ax, cmap="Blues", linewidths=0.3, linecolor=DARK_BG,
                 annot=True, fmt="d", annot_kws={"size": 7},
                 cbar_kws={"label": "Transaction Count"})
     ax.set_title("Transaction Activity Heatmap  (Day × Hour)")
     ax.set_xlabel("Hour of Day")
     ax.set_ylabel("Day of Week")
-    plt.tight_layout()
     return savefig(fig, "06_hourly_heatmap.png", output_dir)
 
 
 # ─────────────────────────────────────────────
 # PLOT 7 – Fraud Analysis Dashboard
 # ─────────────────────────────────────────────
-def plot_fraud_dashboard(df: pd.DataFrame, hourly_df: pd.DataFrame,
-                          monthly_fraud: pd.DataFrame, output_dir="outputs"):
-    fig = plt.figure(figsize=(18, 10))
+def plot_fraud_dashboard(status_counts: pd.Series, hourly_df: pd.DataFrame,
+                          monthly_fraud: pd.DataFrame, normal_amounts: np.ndarray,
+                          fraud_amounts: np.ndarray, output_dir="outputs"):
+    fig = _get_fig(18, 10)
     fig.suptitle("FRAUD DETECTION ANALYSIS", fontsize=15, fontweight="bold",
-                 color=DANGER, y=1.01)
+                 color=DANGER)
 
-    gs = fig.add_gridspec(2, 3, hspace=0.45, wspace=0.4)
+    gs = fig.add_gridspec(2, 3)
 
     # (A) Fraud vs Normal Pie
     ax1 = fig.add_subplot(gs[0, 0])
-    fraud_counts = df["status"].value_counts()
-    ax1.pie(fraud_counts, labels=fraud_counts.index, colors=[ACCENT2, DANGER],
+    ax1.pie(status_counts, labels=status_counts.index, colors=[ACCENT2, DANGER],
             autopct="%1.1f%%", wedgeprops=dict(edgecolor=DARK_BG, linewidth=2),
             startangle=90, pctdistance=0.75)
     ax1.set_title("Transaction Status Split")
@@ -243,47 +290,49 @@ def plot_fraud_dashboard(df: pd.DataFrame, hourly_df: pd.DataFrame,
 
     # (D) Amount Distribution: Fraud vs Normal
     ax4 = fig.add_subplot(gs[1, 2])
-    normal_amounts = df[df["is_fraud"]==0]["amount"]
-    fraud_amounts  = df[df["is_fraud"]==1]["amount"]
-    ax4.hist(normal_amounts, bins=30, alpha=0.6, color=ACCENT,  label="Normal", density=True)
-    ax4.hist(fraud_amounts,  bins=15, alpha=0.8, color=DANGER, label="Flagged", density=True)
+    # max(initial=1) keeps the edges valid when a split is empty (e.g. no flagged txns)
+    edges = np.linspace(0, max(normal_amounts.max(initial=1), fraud_amounts.max(initial=1)), 31)
+    hn = _hist_density(normal_amounts, edges)
+    hf = _hist_density(fraud_amounts,  edges)
+    width = np.diff(edges)
+    ax4.bar(edges[:-1], hn, width=width, alpha=0.6, color=ACCENT, label="Normal",  align="edge")
+    ax4.bar(edges[:-1], hf, width=width, alpha=0.8, color=DANGER, label="Flagged", align="edge")
     ax4.set_title("Amount Distribution: Fraud vs Normal")
     ax4.set_xlabel("Amount (₹)"); ax4.set_ylabel("Density")
     ax4.legend()
 
-    plt.tight_layout()
     return savefig(fig, "07_fraud_dashboard.png", output_dir)
 
 
 # ─────────────────────────────────────────────
 # PLOT 8 – Payment Mode & Bank Analysis
 # ─────────────────────────────────────────────
-def plot_payment_mode(df: pd.DataFrame, output_dir="outputs"):
-    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+def plot_payment_mode(mode_df: pd.DataFrame, bank_df: pd.DataFrame, output_dir="outputs"):
+    fig = _get_fig(14, 5)
+    axes = fig.subplots(1, 2)
 
-    mode_df = df.groupby("payment_mode")["amount"].agg(["count","sum"]).reset_index()
     axes[0].bar(mode_df["payment_mode"], mode_df["count"], color=PALETTE[:3], edgecolor=DARK_BG)
     axes[0].set_title("Transactions by Payment Mode")
     axes[0].set_ylabel("Count")
 
-    bank_df = df.groupby("sender_bank")["amount"].sum().sort_values(ascending=False).reset_index()
-    axes[1].bar(bank_df["sender_bank"], bank_df["amount"]/1000, color=PALETTE, edgecolor=DARK_BG)
+    axes[1].bar(bank_df["sender_bank"], bank_df["total_spend"]/1000, color=PALETTE, edgecolor=DARK_BG)
     axes[1].set_title("Total Spend by Sender Bank (₹k)")
     axes[1].set_ylabel("Total Spend (₹k)")
     axes[1].tick_params(axis="x", rotation=30)
 
-    plt.tight_layout()
     return savefig(fig, "08_payment_mode_bank.png", output_dir)
 
 
 # ─────────────────────────────────────────────
 # PLOT 9 – Anomaly Score Distribution
 # ─────────────────────────────────────────────
-def plot_anomaly_scores(df: pd.DataFrame, output_dir="outputs"):
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+def plot_anomaly_scores(normal_scores: np.ndarray, fraud_scores: np.ndarray,
+                        top_risky: pd.DataFrame, output_dir="outputs"):
+    fig = _get_fig(14, 5)
+    ax1, ax2 = fig.subplots(1, 2)
 
-    ax1.hist(df[df["is_fraud"]==0]["anomaly_score"], bins=30, color=ACCENT,  alpha=0.7, label="Normal",  density=True)
-    ax1.hist(df[df["is_fraud"]==1]["anomaly_score"], bins=15, color=DANGER, alpha=0.8, label="Flagged", density=True)
+    ax1.hist(normal_scores, bins=30, color=ACCENT,  alpha=0.7, label="Normal",  density=True)
+    ax1.hist(fraud_scores,  bins=15, color=DANGER, alpha=0.8, label="Flagged", density=True)
     ax1.axvline(70, color=WARN, linestyle="--", linewidth=1.5, label="Risk Threshold (70)")
     ax1.set_title("Anomaly Score Distribution")
     ax1.set_xlabel("Anomaly Score (0–100)")
@@ -291,16 +340,14 @@ def plot_anomaly_scores(df: pd.DataFrame, output_dir="outputs"):
     ax1.legend()
 
     # Top 20 risky transactions
-    top_risky = df.nlargest(20, "anomaly_score")[["transaction_id","merchant","amount","anomaly_score","is_fraud"]]
     colors = [DANGER if f else ACCENT for f in top_risky["is_fraud"]]
-    ax2.barh(top_risky["merchant"] + " (" + top_risky["transaction_id"] + ")",
+    ax2.barh(top_risky["merchant"].astype(str) + " (" + top_risky["transaction_id"] + ")",
              top_risky["anomaly_score"], color=colors, edgecolor=DARK_BG)
     ax2.set_title("Top 20 High-Risk Transactions")
     ax2.set_xlabel("Anomaly Score")
     ax2.invert_yaxis()
     ax2.tick_params(axis="y", labelsize=7)
 
-    plt.tight_layout()
     return savefig(fig, "09_anomaly_scores.png", output_dir)
 
 
@@ -308,7 +355,8 @@ def plot_anomaly_scores(df: pd.DataFrame, output_dir="outputs"):
 # PLOT 10 – State-wise Spend
 # ─────────────────────────────────────────────
 def plot_state_spend(state_df: pd.DataFrame, output_dir="outputs"):
-    fig, ax = plt.subplots(figsize=(12, 5))
+    fig = _get_fig(12, 5)
+    ax = fig.subplots()
     colors = [PALETTE[i % len(PALETTE)] for i in range(len(state_df))]
     bars = ax.bar(state_df["state"], state_df["total_spend"]/1000, color=colors, edgecolor=DARK_BG, width=0.65)
     for bar, val in zip(bars, state_df["total_spend"]/1000):
@@ -317,5 +365,4 @@ def plot_state_spend(state_df: pd.DataFrame, output_dir="outputs"):
     ax.set_title("Total UPI Spend by State")
     ax.set_ylabel("Total Spend (₹ thousands)")
     ax.tick_params(axis="x", rotation=30)
-    plt.tight_layout()
     return savefig(fig, "10_state_spend.png", output_dir)